@@ -1,27 +1,77 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+import operator
 import os
+import re
+import socket
 import sys
 import time
+import random
 import logging
 import configparser
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
+try:
+    import ijson  # Optional: streaming JSON parse with early exit
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # Optional: 2-5x faster JSON decode than stdlib
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+try:
+    import httpx  # Optional: HTTP/2 client, enabled via USC_USE_HTTP2=1
+except ImportError:
+    httpx = None
+
+try:
+    import xxhash  # Optional: much faster body hashing than hashlib
+    _body_hash = xxhash.xxh64_intdigest
+except ImportError:
+    import zlib
+    _body_hash = zlib.crc32
+
+# Exception families for the session returned by get_session(): httpx
+# errors live outside the requests hierarchy, so every catch/retry on the
+# sync path has to cover both or USC_USE_HTTP2=1 would bypass them all.
+if httpx is not None:
+    _HTTP_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+    _HTTP_TIMEOUTS = (requests.exceptions.Timeout, httpx.TimeoutException)
+else:
+    _HTTP_ERRORS = (requests.exceptions.RequestException,)
+    _HTTP_TIMEOUTS = (requests.exceptions.Timeout,)
+
 
 # ============================================================
 # Logging Setup
 # ============================================================
 
+_logging_configured = False
+
+
 def setup_logging(log_level: str = 'INFO', log_file: Optional[str] = None):
     """
     Configure logging with both console and optional file output.
 
+    Safe to call repeatedly: only the first call configures handlers,
+    so long-lived processes and tests can re-run loadConfig freely.
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
         log_file: Optional path to log file
     """
+    global _logging_configured
+    if _logging_configured:
+        return
+
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     handlers = [logging.StreamHandler()]
 
@@ -34,18 +84,125 @@ def setup_logging(log_level: str = 'INFO', log_file: Optional[str] = None):
         handlers=handlers,
         force=True  # Override any existing configuration
     )
+    _logging_configured = True
 
 
 logger = logging.getLogger('usc_auto_book')
 
 
+# ============================================================
+# Exceptions
+# ============================================================
+
+class RateLimited(Exception):
+    """
+    Raised when the API answers 429 Too Many Requests.
+
+    Carries the server's Retry-After hint so callers can wait exactly as
+    long as the server asks instead of applying their own backoff.
+    """
+
+    def __init__(self, retry_after: int = 60):
+        super().__init__(f"Rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+# ============================================================
+# HTTP Session
+# ============================================================
+
+# Either a requests.Session or (with USC_USE_HTTP2=1) an httpx.Client;
+# both expose the same get/post/headers/close surface used here.
+_SESSION: Optional[Any] = None
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keepalive on pooled sockets, so idle
+    connections survive long waits between polls."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+def get_session():
+    """
+    Return the shared HTTP session, creating it on first use.
+
+    Reusing one session keeps TCP/TLS connections alive across the
+    polling loop instead of paying a full handshake on every request.
+    With USC_USE_HTTP2=1 and httpx installed, an HTTP/2 client is used
+    instead so findClass/login/bookEvent multiplex over one connection.
+    """
+    global _SESSION
+    if _SESSION is None:
+        if httpx is not None and os.getenv('USC_USE_HTTP2', '') == '1':
+            _SESSION = httpx.Client(http2=True, timeout=30)
+        else:
+            _SESSION = requests.Session()
+            adapter = _KeepAliveAdapter(pool_connections=4, pool_maxsize=10, max_retries=0)
+            _SESSION.mount('https://', adapter)
+            _SESSION.mount('http://', adapter)
+    return _SESSION
+
+
+def close_session():
+    """Close the shared HTTP session (call once on shutdown)."""
+    global _SESSION
+    if _SESSION is not None:
+        _SESSION.close()
+        _SESSION = None
+
+
+# ============================================================
+# Course Listing Cache
+# ============================================================
+
+# Cached /courses responses keyed by (locationId, 'YYYY-MM-DD'). Each entry
+# holds the parsed class list plus the HTTP validators (ETag/Last-Modified)
+# so an unchanged listing can be revalidated with a cheap 304 instead of
+# being re-downloaded and re-parsed on every poll.
+_courses_cache: Dict[Any, Dict[str, Any]] = {}
+
+# Hash of the last 200-response body per (locationId, 'YYYY-MM-DD'). A
+# byte-identical body means nothing changed since the previous poll, so
+# decoding and filtering can be skipped outright.
+_last_body_hash: Dict[Any, int] = {}
+
+
+def _cache_ttl(config: Dict[str, Any]) -> float:
+    """
+    TTL for cached course listings.
+
+    Defaults to a quarter of the poll interval, capped at 60s, so the
+    cache scales with the polling cadence; cacheTtlSeconds pins it to an
+    explicit value instead.
+    """
+    ttl = config.get('cacheTtlSeconds')
+    if ttl:
+        return float(ttl)
+    return min(config.get('pollInterval', 1800) / 4, 60)
+
+
+def invalidate_courses_cache():
+    """Drop all cached course listings (called after a successful booking)."""
+    _courses_cache.clear()
+    _last_body_hash.clear()
+
+
 # ============================================================
 # Retry Decorator
 # ============================================================
 
-def retry_on_failure(max_retries=3, backoff_factor=2, retry_on=(requests.exceptions.RequestException,)):
+def retry_on_failure(max_retries=3, backoff_factor=2, retry_on=_HTTP_ERRORS):
     """
-    Decorator to retry functions with exponential backoff.
+    Decorator to retry functions with jittered exponential backoff.
+
+    The wait is drawn uniformly from [0, backoff_factor ** attempt] (full
+    jitter) so multiple instances don't retry in lockstep against the API.
+    RateLimited errors sleep exactly the server's Retry-After hint instead.
 
     Args:
         max_retries: Maximum number of retry attempts
@@ -58,15 +215,24 @@ def retry_on_failure(max_retries=3, backoff_factor=2, retry_on=(requests.excepti
             for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
+                except RateLimited as e:
+                    if attempt == max_retries:
+                        logger.error(f"{func.__name__} still rate limited after {max_retries} retries")
+                        raise
+                    logger.warning(
+                        f"{func.__name__} rate limited (attempt {attempt + 1}/{max_retries + 1}). "
+                        f"Honoring Retry-After: {e.retry_after}s"
+                    )
+                    time.sleep(e.retry_after)
                 except retry_on as e:
                     if attempt == max_retries:
                         logger.error(f"{func.__name__} failed after {max_retries} retries: {e}")
                         raise
 
-                    wait_time = backoff_factor ** attempt
+                    wait_time = random.uniform(0, backoff_factor ** attempt)
                     logger.warning(
                         f"{func.__name__} failed (attempt {attempt + 1}/{max_retries + 1}): {e}. "
-                        f"Retrying in {wait_time}s..."
+                        f"Retrying in {wait_time:.1f}s..."
                     )
                     time.sleep(wait_time)
 
@@ -91,36 +257,82 @@ def loadConfigLegacy(config_name='usc_api.config'):
     logger.warning("See .env.example for template.")
     logger.warning("="*60)
 
-    config = configparser.ConfigParser()
-    config.readfp(open(config_name))
+    # interpolation=None skips the per-value '%' interpolation scan; readfp
+    # was removed in Python 3.12, read() replaces it.
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(config_name)
+
+    credentials = config['Credentials']
+    client = config['Client']
+    api = config['API']
+    headers = config['Headers']
+
     return {
-        'email':         config.get('Credentials', 'email'),
-        'password':      config.get('Credentials', 'password'),
-        'clientSecret':  config.get('Client', 'secret'),
-        'clientId':      config.get('Client', 'id'),
-        'baseURL':       config.get('API', 'baseURL'),
+        'email':         credentials['email'],
+        'password':      credentials['password'],
+        'clientSecret':  client['secret'],
+        'clientId':      client['id'],
+        'baseURL':       api['baseURL'],
         'headers': {
-            'accept-encoding':  config.get('Headers', 'accept-encoding'),
-            'user-agent':       config.get('Headers', 'user-agent'),
-            'accept-language':  config.get('Headers', 'accept-language'),
+            'accept-encoding':  headers['accept-encoding'],
+            'user-agent':       headers['user-agent'],
+            'accept-language':  headers['accept-language'],
         },
         # Legacy mode - use hardcoded defaults for new settings
         'locationId': 15238,
         'advanceDays': 14,
         'pollInterval': 1800,
+        'maxPollInterval': 7200,
         'classTitleFilter': '',
         'instructorFilter': '',
         'timeRangeStart': '',
         'timeRangeEnd': '',
+        'releaseHour': None,
+        'releaseMinute': 0,
+        'candidateDates': [0],
+        'cacheTtlSeconds': None,
+        'negativeCacheTtl': 20,
+    }
+
+
+def _finalize_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive per-endpoint URLs and the static part of the /courses query
+    once at load time, and install the configured headers as session
+    defaults. Saves string formatting and URL parsing on every poll.
+    """
+    config['courses_url'] = config['baseURL'] + '/courses'
+    config['auth_url'] = config['baseURL'] + '/auth/token'
+    config['bookings_url'] = config['baseURL'] + '/bookings'
+    config['courses_params_tmpl'] = {
+        'forDurationOfDays': 1,
+        'query': '',
+        'pageSize': 100,
+        'page': 1,
+        'locationId': config['locationId'],
     }
+    get_session().headers.update(config['headers'])
+
+    # Warm up the pool so the first real request reuses an already
+    # established TLS connection instead of paying the full handshake.
+    try:
+        get_session().head(config['courses_url'], timeout=5)
+    except _HTTP_ERRORS:
+        pass  # Best-effort only; the first poll will connect normally
+
+    return config
 
 
+@lru_cache(maxsize=1)
 def loadConfig():
     """
     Load configuration from environment variables.
     Falls back to .env file if environment variables not set.
     Falls back to legacy usc_api.config if .env doesn't exist.
 
+    The result is cached for the process lifetime, so repeated calls skip
+    the load_dotenv filesystem walk and the os.path.exists checks.
+
     Returns:
         dict: Configuration dictionary with all required settings
 
@@ -137,7 +349,7 @@ def loadConfig():
         log_level = os.getenv('USC_LOG_LEVEL', 'INFO')
         log_file = os.getenv('USC_LOG_FILE', '')
         setup_logging(log_level, log_file if log_file else None)
-        return config
+        return _finalize_config(config)
 
     # Required variables
     required_vars = ['USC_EMAIL', 'USC_PASSWORD', 'USC_LOCATION_ID']
@@ -167,7 +379,7 @@ def loadConfig():
         'baseURL': os.getenv('USC_API_BASE_URL',
                             'https://api.urbansportsclub.com/api/v5'),
         'headers': {
-            'accept-encoding': os.getenv('USC_ACCEPT_ENCODING', 'gzip, deflate'),
+            'accept-encoding': os.getenv('USC_ACCEPT_ENCODING', 'gzip, deflate, br'),
             'user-agent': os.getenv('USC_USER_AGENT',
                                    'USCAPP/4.0.8 (android; 28; Scale/2.75)'),
             'accept-language': os.getenv('USC_ACCEPT_LANGUAGE', 'en-US;q=1.0'),
@@ -176,6 +388,23 @@ def loadConfig():
         'locationId': int(os.getenv('USC_LOCATION_ID')),
         'advanceDays': int(os.getenv('USC_ADVANCE_DAYS', '14')),
         'pollInterval': int(os.getenv('USC_POLL_INTERVAL', '1800')),
+        # Cap for the empty-poll backoff (default: 4x the poll interval)
+        'maxPollInterval': (int(os.getenv('USC_MAX_POLL_INTERVAL'))
+                            if os.getenv('USC_MAX_POLL_INTERVAL', '').strip()
+                            else int(os.getenv('USC_POLL_INTERVAL', '1800')) * 4),
+        # Release window (empty = unknown, poll at fixed interval)
+        'releaseHour': (int(os.getenv('USC_RELEASE_HOUR'))
+                        if os.getenv('USC_RELEASE_HOUR', '').strip() else None),
+        'releaseMinute': int(os.getenv('USC_RELEASE_MINUTE', '0')),
+        # Day offsets (relative to the target date) probed concurrently
+        'candidateDates': [int(o) for o in
+                           os.getenv('USC_CANDIDATE_DATES', '0').split(',')
+                           if o.strip()] or [0],
+        # Course-listing cache TTL (empty = auto: pollInterval/4, max 60s)
+        'cacheTtlSeconds': (int(os.getenv('USC_CACHE_TTL'))
+                            if os.getenv('USC_CACHE_TTL', '').strip() else None),
+        # How long a confirmed-empty poll result is trusted without re-asking
+        'negativeCacheTtl': int(os.getenv('USC_NEGATIVE_CACHE_TTL', '20')),
         # Filters (Phase 4)
         'classTitleFilter': os.getenv('USC_CLASS_TITLE_FILTER', '').strip(),
         'instructorFilter': os.getenv('USC_INSTRUCTOR_FILTER', '').strip(),
@@ -183,10 +412,12 @@ def loadConfig():
         'timeRangeEnd': os.getenv('USC_TIME_RANGE_END', '').strip(),
     }
 
+    _finalize_config(config)
+
     logger.info("Configuration loaded successfully")
-    logger.debug(f"API Base URL: {config['baseURL']}")
-    logger.debug(f"Location ID: {config['locationId']}")
-    logger.debug(f"Advance booking days: {config['advanceDays']}")
+    logger.debug("API Base URL: %s", config['baseURL'])
+    logger.debug("Location ID: %s", config['locationId'])
+    logger.debug("Advance booking days: %s", config['advanceDays'])
 
     return config
 
@@ -196,12 +427,13 @@ def loadConfig():
 # ============================================================
 
 @retry_on_failure(max_retries=3)
-def login(config: Dict[str, Any]) -> Optional[str]:
+def login(config: Dict[str, Any], session: Optional[Any] = None) -> Optional[str]:
     """
     Login with OAuth2 password grant.
 
     Args:
         config: Configuration dictionary
+        session: HTTP session to use (defaults to the shared pooled session)
 
     Returns:
         Bearer token if successful, None otherwise
@@ -209,7 +441,9 @@ def login(config: Dict[str, Any]) -> Optional[str]:
     Raises:
         requests.exceptions.RequestException: On network errors after retries
     """
-    request_url = config['baseURL'] + '/auth/token'
+    if session is None:
+        session = get_session()
+    request_url = config.get('auth_url') or config['baseURL'] + '/auth/token'
 
     data = {
         'username': config['email'],
@@ -220,145 +454,320 @@ def login(config: Dict[str, Any]) -> Optional[str]:
     }
 
     logger.info(f"Logging in as {config['email']}")
-    logger.debug(f"POST: {request_url}")
+    logger.debug("POST: %s", request_url)
 
     try:
-        response = requests.post(request_url, data=data, timeout=30)
+        response = session.post(request_url, data=data, timeout=30)
 
         if response.status_code == 200:
-            token = response.json()['data']['access_token']
+            token = _loads(response.content)['data']['access_token']
             logger.info("Login successful")
             return token
         elif response.status_code == 401:
             logger.error("Login failed: Invalid credentials")
-            logger.debug(f"Response: {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", response.text)
             return None
         elif response.status_code == 403:
             logger.error("Login failed: Access forbidden (check client credentials)")
-            logger.debug(f"Response: {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", response.text)
             return None
         elif response.status_code == 429:
-            logger.error("Login failed: Rate limited. Wait before retrying.")
-            return None
+            retry_after = response.headers.get('Retry-After', '60')
+            raise RateLimited(int(retry_after) if retry_after.isdigit() else 60)
         else:
             logger.error(f"Login failed with status {response.status_code}")
-            logger.debug(f"Response: {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", response.text)
             return None
 
-    except requests.exceptions.Timeout:
+    except _HTTP_TIMEOUTS:
         logger.error("Login request timed out")
         raise
-    except requests.exceptions.RequestException as e:
+    except _HTTP_ERRORS as e:
         logger.error(f"Login request failed: {e}")
         raise
 
 
 def is_bookable(course: Dict[str, Any]) -> bool:
-    """Check if a course is bookable."""
-    return course['bookable'] != 0 and course['freeSpots'] != 0
+    """Check if a course is bookable (bookable flag set and spots left)."""
+    # Both fields are ints; truthiness replaces the two != 0 comparisons
+    return bool(course['bookable'] and course['freeSpots'])
 
 
-def matches_filters(cls: Dict[str, Any], config: Dict[str, Any]) -> bool:
+# Hot-loop accessor: one C-level tuple unpack instead of four dict subscripts
+_CLASS_FIELDS = operator.itemgetter('bookable', 'freeSpots', 'title', 'id')
+
+# Byte-level scans for the non-streaming decode path: most classes in a
+# listing fail the bookable check, so spotting the bookable ones in the raw
+# bytes lets us JSON-decode only those objects.
+_BOOKABLE_KEY_RE = re.compile(rb'"bookable":')
+_BOOKABLE_NUM_RE = re.compile(rb'"bookable":\s*\d')
+_BOOKABLE_FLAG_RE = re.compile(rb'"bookable":\s*[1-9]')
+_CANDIDATE_RE = re.compile(rb'\{[^{}]*?"bookable":\s*[1-9][^{}]*?\}')
+
+
+def _scan_candidate_classes(body: bytes):
     """
-    Check if a class matches configured filters.
+    Decode only the class objects whose bookable flag is non-zero.
+
+    Deliberately conservative: if the byte layout doesn't match the scan's
+    assumptions (nested objects around the flag, formatting changes), it
+    returns None and the caller falls back to a full decode.
+
+    Returns:
+        List of candidate class dicts (possibly empty), or None if the
+        scan can't be trusted.
+    """
+    # Only trust the scan when every bookable flag is numeric; a payload
+    # using e.g. booleans would otherwise pass as "nothing bookable".
+    if len(_BOOKABLE_NUM_RE.findall(body)) != len(_BOOKABLE_KEY_RE.findall(body)):
+        return None
+
+    flagged = len(_BOOKABLE_FLAG_RE.findall(body))
+    if flagged == 0:
+        # Nothing bookable in the payload (or no classes at all)
+        return []
+
+    candidates = []
+    for match in _CANDIDATE_RE.finditer(body):
+        try:
+            candidates.append(_loads(match.group(0)))
+        except ValueError:
+            return None
+
+    # A miscount means some bookable object had a shape the regex can't
+    # delimit (e.g. nested braces) - don't risk missing it.
+    if len(candidates) != flagged:
+        return None
+    return candidates
+
+
+def compile_filters(config: Dict[str, Any]):
+    """
+    Build a per-class filter predicate from the configured filters.
+
+    Substring needles are compiled once into case-insensitive regexes, so
+    matching a class costs one C-level search instead of lowercasing a
+    fresh copy of each string per class. Class start times are compared
+    as the fixed-width 'HH:MM' slice of the ISO 8601 timestamp (chars
+    11-16), which orders lexicographically — no datetime parsing per
+    class.
 
     Args:
-        cls: Class object from API
         config: Configuration with filter settings
 
     Returns:
-        True if class matches all filters (or no filters set)
+        A callable(cls) -> bool, or None when no filters are configured
+        so callers can skip filter evaluation entirely.
     """
-    # Title filter (case-insensitive substring match)
-    title_filter = config.get('classTitleFilter', '').strip()
-    if title_filter:
-        class_title = cls.get('title', '').lower()
-        if title_filter.lower() not in class_title:
-            logger.debug(f"Class '{cls['title']}' filtered out by title filter")
-            return False
+    title_f = config.get('classTitleFilter', '').strip()
+    instructor_f = config.get('instructorFilter', '').strip()
+    time_start = config.get('timeRangeStart', '').strip() or None
+    time_end = config.get('timeRangeEnd', '').strip() or None
+
+    if not (title_f or instructor_f or time_start or time_end):
+        return None
+
+    title_search = (re.compile(re.escape(title_f), re.IGNORECASE).search
+                    if title_f else None)
+    instructor_search = (re.compile(re.escape(instructor_f), re.IGNORECASE).search
+                         if instructor_f else None)
 
-    # Instructor filter (case-insensitive substring match)
-    instructor_filter = config.get('instructorFilter', '').strip()
-    if instructor_filter:
-        # Instructor might be in different fields depending on API version
-        instructor = cls.get('instructor', cls.get('instructorName', '')).lower()
-        if instructor_filter.lower() not in instructor:
-            logger.debug(f"Class '{cls['title']}' filtered out by instructor filter")
+    def matcher(cls: Dict[str, Any]) -> bool:
+        if title_search and not title_search(cls.get('title', '')):
             return False
 
-    # Time range filter
-    time_start = config.get('timeRangeStart', '').strip()
-    time_end = config.get('timeRangeEnd', '').strip()
+        if instructor_search:
+            # Instructor might be in different fields depending on API version
+            instructor = cls.get('instructor', cls.get('instructorName', '')) or ''
+            if not instructor_search(instructor):
+                return False
 
-    if time_start or time_end:
-        # Parse class start time (format: ISO 8601)
-        try:
+        if time_start or time_end:
             class_time_str = cls.get('startDateTimeUTC', cls.get('startDateTime', ''))
-            # Handle ISO 8601 format with or without Z
-            class_time_str = class_time_str.replace('Z', '+00:00')
-            class_time = datetime.fromisoformat(class_time_str)
-            class_hour_min = class_time.strftime('%H:%M')
+            class_hour_min = class_time_str[11:16]
+            if class_hour_min:
+                if time_start and class_hour_min < time_start:
+                    return False
+                if time_end and class_hour_min > time_end:
+                    return False
+            # Don't filter out if there's no parseable time
 
-            if time_start and class_hour_min < time_start:
-                logger.debug(
-                    f"Class '{cls['title']}' at {class_hour_min} "
-                    f"filtered out (before {time_start})"
-                )
-                return False
+        return True
 
-            if time_end and class_hour_min > time_end:
-                logger.debug(
-                    f"Class '{cls['title']}' at {class_hour_min} "
-                    f"filtered out (after {time_end})"
-                )
-                return False
+    return matcher
 
-        except (ValueError, KeyError) as e:
-            logger.warning(f"Could not parse time for filtering: {e}")
-            # Don't filter out if we can't parse time
 
-    return True
+def matches_filters(cls: Dict[str, Any], config: Dict[str, Any]) -> bool:
+    """
+    Check if a class matches configured filters.
+
+    Convenience wrapper around compile_filters() for one-off checks;
+    hot loops should build the predicate once instead.
+
+    Args:
+        cls: Class object from API
+        config: Configuration with filter settings
+
+    Returns:
+        True if class matches all filters (or no filters set)
+    """
+    matcher = compile_filters(config)
+    return matcher is None or matcher(cls)
 
 
 @retry_on_failure(max_retries=3)
-def findClass(config: Dict[str, Any], date: Optional[datetime] = None) -> Optional[int]:
+def findClass(config: Dict[str, Any], date: Optional[datetime] = None,
+              str_date: Optional[str] = None,
+              session: Optional[Any] = None,
+              matcher: Optional[Any] = None) -> Optional[int]:
     """
     Find a bookable class on the given date.
 
     Args:
         config: Configuration dictionary
         date: Target date (defaults to config['advanceDays'] from today)
+        str_date: Pre-formatted 'YYYY-MM-DD' date; callers polling the same
+            date repeatedly can pass this to skip the per-call strftime
+        session: HTTP session to use (defaults to the shared pooled session)
+        matcher: Precompiled filter predicate from compile_filters();
+            polling loops can build it once instead of once per call
 
     Returns:
         Class ID if bookable class found, None otherwise
     """
-    if date is None:
-        advance_days = config.get('advanceDays', 14)
-        date = datetime.today() + timedelta(days=advance_days)
+    if session is None:
+        session = get_session()
+    if str_date is None:
+        if date is None:
+            advance_days = config.get('advanceDays', 14)
+            date = datetime.today() + timedelta(days=advance_days)
+        str_date = date.strftime('%Y-%m-%d')
 
-    str_date = date.strftime('%Y-%m-%d')
     location_id = config['locationId']
 
-    # Fixed: Remove duplicate 'courses?' in URL (bug from original code)
-    request_url = (
-        f"{config['baseURL']}/courses?"
-        f"forDurationOfDays=1&query=&pageSize=100&page=1&"
-        f"locationId={location_id}&startDate={str_date}"
-    )
+    request_url = config.get('courses_url') or config['baseURL'] + '/courses'
+    params = dict(config.get('courses_params_tmpl') or {
+        'forDurationOfDays': 1,
+        'query': '',
+        'pageSize': 100,
+        'page': 1,
+        'locationId': location_id,
+    })
+    params['startDate'] = str_date
 
     logger.info(f"Searching for classes at location {location_id} on {str_date}")
-    logger.debug(f"GET: {request_url}")
+    logger.debug("GET: %s (%s)", request_url, str_date)
+
+    cache_key = (location_id, str_date)
+    entry = _courses_cache.get(cache_key)
 
     try:
-        response = requests.get(request_url, headers=config['headers'], timeout=30)
+        classes = None   # Fully materialized list (cache hit, 304, or full decode)
+        response = None
 
-        if response.status_code != 200:
-            logger.error(f"Failed to fetch classes (status {response.status_code})")
-            logger.debug(f"Response: {response.text[:500]}")
-            return None
+        if entry is not None and time.time() < entry['expires']:
+            logger.debug("Using cached class list for %s (TTL not expired)", str_date)
+            classes = entry['classes']
+        else:
+            # Past TTL (or no cache yet): revalidate with conditional headers
+            # so an unchanged listing comes back as a body-less 304.
+            headers = dict(config['headers'])
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+
+            response = session.get(request_url, params=params, headers=headers,
+                                   timeout=30)
+
+            if response.status_code == 304 and entry is not None:
+                logger.debug("Class list for %s unchanged (304), reusing cache", str_date)
+                entry['expires'] = time.time() + _cache_ttl(config)
+                classes = entry['classes']
+            elif response.status_code == 429:
+                retry_after = response.headers.get('Retry-After', '60')
+                raise RateLimited(int(retry_after) if retry_after.isdigit() else 60)
+            elif response.status_code != 200:
+                logger.error(f"Failed to fetch classes (status {response.status_code})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Response: %s", response.text[:500])
+                return None
+            else:
+                body = response.content
+                body_hash = _body_hash(body)
+                if _last_body_hash.get(cache_key) == body_hash:
+                    # Byte-identical to the previous poll: nothing changed,
+                    # skip decoding and filtering entirely.
+                    logger.debug("Class list for %s unchanged (hash match), skipping parse",
+                                 str_date)
+                    if entry is not None:
+                        entry['expires'] = time.time() + _cache_ttl(config)
+                    return None
+
+                if ijson is None:
+                    # No streaming parser available: try decoding only the
+                    # bookable candidates before paying for a full decode.
+                    classes = _scan_candidate_classes(body)
+                    if classes is None:
+                        classes = _loads(body)['data'].get('classes', [])
+
+        # Build the filter predicate once per call unless the caller
+        # already compiled it outside its polling loop
+        if matcher is None:
+            matcher = compile_filters(config)
+
+        if classes is not None:
+            class_iter = iter(classes)
+            streamed = None
+        else:
+            # Parse the body incrementally with ijson so decoding stops at
+            # the first bookable match instead of materializing all classes
+            class_iter = ijson.items(body, 'data.classes.item')
+            streamed = []
 
-        data = response.json()['data']
-        classes = data.get('classes', [])
+        # Find first bookable class that matches filters
+        found = None
+        for cls in class_iter:
+            if streamed is not None:
+                streamed.append(cls)
+            bookable, free_spots, title, cls_id = _CLASS_FIELDS(cls)
+            if bookable and free_spots and (matcher is None or matcher(cls)):
+                found = cls
+                break
+
+        if found is not None:
+            logger.info(
+                f"Found bookable class matching filters: '{title}' "
+                f"(ID: {cls_id}) at {found.get('startDateTimeUTC', 'N/A')}"
+            )
+            logger.debug(
+                f"Class details - Spots: {free_spots}/{found['maximumNumber']}, "
+                f"Bookable: {bookable}"
+            )
+            return cls_id
+
+        if streamed is not None:
+            classes = streamed
+
+        # No match: record the body hash only now, so an identical body
+        # can only ever short-circuit a previously-negative result - a
+        # caller polling again after a match must see it again
+        if response is not None and response.status_code == 200:
+            _last_body_hash[cache_key] = body_hash
+
+        # No match: the list is fully known, so cache it for later polls
+        if (response is not None and response.status_code == 200
+                and 'no-store' not in response.headers.get('Cache-Control', '')):
+            _courses_cache[cache_key] = {
+                'classes': classes,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'expires': time.time() + _cache_ttl(config),
+            }
 
         if not classes:
             logger.info(f"No classes found on {str_date}")
@@ -366,46 +775,36 @@ def findClass(config: Dict[str, Any], date: Optional[datetime] = None) -> Option
 
         logger.info(f"Found {len(classes)} classes")
 
-        # Find first bookable class that matches filters
-        for cls in classes:
-            if is_bookable(cls) and matches_filters(cls, config):
-                logger.info(
-                    f"Found bookable class matching filters: '{cls['title']}' "
-                    f"(ID: {cls['id']}) at {cls.get('startDateTimeUTC', 'N/A')}"
-                )
-                logger.debug(
-                    f"Class details - Spots: {cls['freeSpots']}/{cls['maximumNumber']}, "
-                    f"Bookable: {cls['bookable']}"
-                )
-                return cls['id']
-
         # Log why classes aren't bookable or don't match filters
         logger.warning("No bookable classes matching filters found. Sample classes:")
-        for cls in classes[:3]:  # Log first 3
-            bookable_status = "✓" if is_bookable(cls) else "✗"
-            filter_status = "✓" if matches_filters(cls, config) else "✗"
-            logger.debug(
-                f"  [{bookable_status} bookable, {filter_status} filters] '{cls['title']}': "
-                f"spots={cls['freeSpots']}/{cls['maximumNumber']}, "
-                f"bookable={cls['bookable']}"
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            for cls in classes[:3]:  # Log first 3
+                bookable_status = "✓" if is_bookable(cls) else "✗"
+                filter_status = "✓" if (matcher is None or matcher(cls)) else "✗"
+                logger.debug(
+                    f"  [{bookable_status} bookable, {filter_status} filters] '{cls['title']}': "
+                    f"spots={cls['freeSpots']}/{cls['maximumNumber']}, "
+                    f"bookable={cls['bookable']}"
+                )
 
         return None
 
-    except requests.exceptions.Timeout:
+    except _HTTP_TIMEOUTS:
         logger.error("Request timed out while fetching classes")
         raise
     except (KeyError, ValueError) as e:
         logger.error(f"Unexpected API response structure: {e}")
-        logger.debug(f"Response: {response.text[:500] if 'response' in locals() else 'N/A'}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response: %s", response.text[:500] if 'response' in locals() else 'N/A')
         raise
-    except requests.exceptions.RequestException as e:
+    except _HTTP_ERRORS as e:
         logger.error(f"Failed to fetch classes: {e}")
         raise
 
 
 @retry_on_failure(max_retries=2)  # Fewer retries for booking to avoid double-booking
-def bookEvent(class_id: int, bearer: str, config: Dict[str, Any]) -> bool:
+def bookEvent(class_id: int, bearer: str, config: Dict[str, Any],
+              session: Optional[Any] = None) -> bool:
     """
     Book a class.
 
@@ -413,45 +812,56 @@ def bookEvent(class_id: int, bearer: str, config: Dict[str, Any]) -> bool:
         class_id: ID of class to book
         bearer: Bearer token from login
         config: Configuration dictionary
+        session: HTTP session to use (defaults to the shared pooled session)
 
     Returns:
         True if booking successful, False otherwise
     """
-    request_url = config['baseURL'] + '/bookings'
+    if session is None:
+        session = get_session()
+    request_url = config.get('bookings_url') or config['baseURL'] + '/bookings'
 
     data = {'courseId': class_id}
     headers = config['headers'].copy()
     headers['authorization'] = f'Bearer {bearer}'
 
     logger.info(f"Attempting to book class {class_id}")
-    logger.debug(f"POST: {request_url}")
+    logger.debug("POST: %s", request_url)
 
     try:
-        response = requests.post(request_url, data=data, headers=headers, timeout=30)
+        response = session.post(request_url, data=data, headers=headers, timeout=30)
 
         if response.status_code == 200:
-            booking_id = response.json()['data']['id']
+            booking_id = _loads(response.content)['data']['id']
             logger.info(f"Successfully booked class {class_id}! Booking ID: {booking_id}")
+            # Spot counts just changed server-side; don't serve stale listings.
+            invalidate_courses_cache()
             return True
         elif response.status_code == 409:
             logger.error("Booking failed: Class already booked or full")
-            logger.debug(f"Response: {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", response.text)
             return False
         elif response.status_code == 401:
             logger.error("Booking failed: Authentication token expired")
             return False
         elif response.status_code == 403:
             logger.error("Booking failed: Access forbidden")
-            logger.debug(f"Response: {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", response.text)
             return False
+        elif response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '60')
+            raise RateLimited(int(retry_after) if retry_after.isdigit() else 60)
         else:
             logger.error(f"Booking failed with status {response.status_code}")
-            logger.debug(f"Response: {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", response.text)
             return False
 
-    except requests.exceptions.Timeout:
+    except _HTTP_TIMEOUTS:
         logger.error("Booking request timed out")
         raise
-    except requests.exceptions.RequestException as e:
+    except _HTTP_ERRORS as e:
         logger.error(f"Booking request failed: {e}")
         raise
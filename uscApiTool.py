@@ -5,6 +5,12 @@ Automatically books Urban Sports Club classes in advance.
 """
 
 import uscApi as usc
+import usc_async
+import asyncio
+import hashlib
+import json
+import random
+import signal
 import time
 import sys
 import logging
@@ -12,8 +18,92 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger('usc_auto_book')
 
+_BANNER = "=" * 60
+
+# Half-width of the hot window around the release moment: within this
+# many seconds either side, the loop polls tightly and bypasses caches.
+_HOT_WINDOW = 120.0
+
+
+def _next_sleep(now, release_time, poll_interval, max_poll_interval,
+                hot_overruns, empty_streak):
+    """
+    Compute seconds to sleep before the next poll.
+
+    With no release time configured, consecutive empty polls back off
+    exponentially from poll_interval up to max_poll_interval, with ±50%
+    jitter so several instances don't poll in lockstep. With a release
+    time: sleep right up to the hot window around the release moment,
+    poll every 2s inside it (±2 minutes), then back off exponentially
+    (capped at the poll interval) once the window has passed.
+
+    Returns (sleep_seconds, hot_overruns) where hot_overruns counts polls
+    since the hot window closed, driving the exponential backoff.
+    """
+    if release_time is None:
+        sleep = min(poll_interval * 2 ** empty_streak, max_poll_interval)
+        return max(1.0, sleep * random.uniform(0.5, 1.5)), 0
+
+    delta = (release_time - now).total_seconds()
+
+    if delta > _HOT_WINDOW:
+        # Before the hot window: sleep right up to its opening edge.
+        return max(1.0, delta - _HOT_WINDOW), 0
+    if delta >= -_HOT_WINDOW:
+        # Within ±2 minutes of the release moment: poll tightly.
+        return 2.0, 0
+    # Release has passed: back off exponentially up to the poll interval.
+    return min(2.0 * (2 ** hot_overruns), poll_interval), hot_overruns + 1
+
+
+async def _probe_dates(config, dates, semaphore, matcher=None, bypass_cache=False):
+    """
+    Probe all candidate dates concurrently, returning the first match.
+
+    With a single date this is a plain find_class call. With several, all
+    probes of one attempt run in a single asyncio.gather — N dates cost
+    roughly one round-trip instead of N — bounded by the semaphore so we
+    stay within the connection pool and USC's rate limits.
+    """
+    if len(dates) == 1:
+        return await usc_async.find_class(config, date=dates[0], matcher=matcher,
+                                          bypass_cache=bypass_cache)
+
+    results = await asyncio.gather(
+        *(usc_async.find_class(config, date=d, semaphore=semaphore, matcher=matcher,
+                               bypass_cache=bypass_cache)
+          for d in dates),
+        return_exceptions=True,
+    )
+
+    error = None
+    for result in results:
+        if isinstance(result, Exception):
+            # Prefer surfacing RateLimited so the caller honors Retry-After
+            if error is None or isinstance(result, usc.RateLimited):
+                error = result
+        elif result is not None:
+            return result
+
+    if error is not None:
+        raise error
+    return None
+
 
 def main():
+    """Entry point: drive the async booking loop and clean up sessions."""
+    try:
+        return asyncio.run(_run())
+    except KeyboardInterrupt:
+        logger.info("\n" + _BANNER)
+        logger.info("Interrupted by user. Exiting...")
+        logger.info(_BANNER)
+        return 130  # Standard exit code for SIGINT
+    finally:
+        usc.close_session()
+
+
+async def _run():
     """Main booking loop."""
     # Load configuration (initializes logging)
     try:
@@ -21,9 +111,27 @@ def main():
     except SystemExit:
         return 1
 
-    logger.info("="*60)
+    logger.info(_BANNER)
     logger.info("USC Auto-Book Tool Started")
-    logger.info("="*60)
+    logger.info(_BANNER)
+
+    # Graceful shutdown: SIGINT/SIGTERM set an event that every sleep in
+    # the loop races against, so Ctrl-C takes effect immediately instead
+    # of waiting out a poll interval.
+    stop = asyncio.Event()
+    interrupted = False
+    loop = asyncio.get_running_loop()
+
+    def _request_stop():
+        nonlocal interrupted
+        interrupted = True
+        stop.set()
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, _request_stop)
+        loop.add_signal_handler(signal.SIGTERM, _request_stop)
+    except NotImplementedError:
+        pass  # Windows: fall back to the KeyboardInterrupt handling in main()
 
     # Calculate target date - find Monday within the 14-day booking window
     advance_days = config.get('advanceDays', 14)
@@ -41,6 +149,15 @@ def main():
     days_ahead = (target_date - today).days
 
     logger.info(f"Target booking date: {target_date_str} (Monday, {days_ahead} days ahead)")
+
+    # Candidate dates: day offsets relative to the target, probed
+    # concurrently each attempt (broad filters may match on adjacent days)
+    candidate_dates = [target_date + timedelta(days=offset)
+                       for offset in config.get('candidateDates', [0])]
+    probe_semaphore = asyncio.Semaphore(4)
+    if len(candidate_dates) > 1:
+        logger.info(f"Candidate dates: {', '.join(d.strftime('%Y-%m-%d') for d in candidate_dates)}")
+
     logger.info(f"Location ID: {config['locationId']}")
     logger.info(f"Poll interval: {config['pollInterval']}s")
 
@@ -56,91 +173,236 @@ def main():
         filters.append(f"before={config['timeRangeEnd']}")
 
     if filters:
-        logger.info(f"Active filters: {', '.join(filters)}")
+        logger.info("Active filters: %s", ', '.join(filters))
     else:
         logger.info("No filters active (will book first available class)")
 
+    # Compile the filter predicate once for the whole run; every probe
+    # reuses it instead of re-lowercasing the needle strings per poll
+    matcher = usc.compile_filters(config)
+
+    # USC publishes classes for target_date when it enters the booking
+    # window, i.e. advanceDays before the class day at the configured
+    # release time. When that moment is still ahead, sleep right up to it
+    # instead of burning polls that can never succeed, then poll tightly.
+    release_time = None
+    if config.get('releaseHour') is not None:
+        window_open = (target_date - timedelta(days=advance_days)).replace(
+            hour=config['releaseHour'],
+            minute=config.get('releaseMinute', 0),
+            second=0,
+            microsecond=0,
+        )
+        if window_open > datetime.now() - timedelta(hours=1):
+            release_time = window_open
+            logger.info(f"Booking window opens: {window_open.strftime('%Y-%m-%d %H:%M')}")
+            pre_wake = (window_open - timedelta(seconds=30) - datetime.now()).total_seconds()
+            if pre_wake > 0:
+                logger.info(f"Sleeping {pre_wake:.0f}s until shortly before the window opens")
+                await usc_async._sleep_or_stop(pre_wake, stop)
+        else:
+            # Window opened a while ago; fall back to the regular backoff
+            logger.info("Booking window for the target date is already open")
+
+    # Negative cache: a recent empty sweep for this (date, filters) pair
+    # is trusted for a short TTL, saving the round-trip on repeat negative
+    # polls. Bypassed inside the hot release window, where every second
+    # of staleness costs the booking.
+    filter_hash = hashlib.blake2b(
+        json.dumps({
+            'title': config.get('classTitleFilter', ''),
+            'instructor': config.get('instructorFilter', ''),
+            'start': config.get('timeRangeStart', ''),
+            'end': config.get('timeRangeEnd', ''),
+        }, sort_keys=True).encode(),
+        digest_size=8,
+    ).hexdigest()
+    neg_cache = {}
+    neg_ttl = config.get('negativeCacheTtl', 20)
+    neg_key = (target_date_str, filter_hash)
+
     # Polling loop
     class_id = None
     poll_interval = config['pollInterval']
     deadline = target_date + timedelta(days=1)
+    # The deadline fires as a one-shot loop callback setting the shared
+    # stop event (loop.time() is monotonic, so wall-clock jumps don't
+    # move it), and the poll loop never has to check the clock itself.
+    deadline_handle = loop.call_at(
+        loop.time() + (deadline - datetime.now()).total_seconds(), stop.set)
+    max_poll_interval = config.get('maxPollInterval', poll_interval * 4)
     attempt = 0
+    hot_overruns = 0
+    empty_streak = 0
+    err_streak = 0
 
-    logger.info(f"Polling will continue until {deadline.strftime('%Y-%m-%d %H:%M:%S')}")
+    # Login pre-warm: keep a fresh OAuth token ready in the background so
+    # the discovery->booking gap is one round-trip, not two. Started
+    # before the first poll and refreshed periodically below.
+    token_task = asyncio.create_task(usc_async.login(config))
+    token_started = time.monotonic()
+    token_retry_at = 0.0
+    token_err_streak = 0
+
+    async def probe():
+        """One polling tick: token upkeep, negative-cache check, probe."""
+        nonlocal attempt, token_task, token_started, token_retry_at, token_err_streak
+
+        in_hot_window = (release_time is not None and
+                         abs((release_time - datetime.now()).total_seconds()) <= _HOT_WINDOW)
+        if not in_hot_window and neg_cache.get(neg_key, 0) > time.monotonic():
+            logger.info("Recent poll was empty, skipping this check")
+            return None
 
-    while datetime.today() < deadline:
         attempt += 1
-        logger.info(f"[Attempt {attempt}] Searching for classes at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        # Log timestamps come from the logging formatter's asctime;
+        # %-style args keep the interpolation lazy on filtered levels
+        logger.info("[Attempt %d] Searching for classes on %s", attempt, target_date_str)
 
-        try:
-            class_id = usc.findClass(config, date=target_date)
+        # Restart the pre-warmed login if it failed (with backoff, so a
+        # 2s hot-window cadence can't hammer the OAuth endpoint), or
+        # every ~10 min so the token stays comfortably within its 1h life
+        if token_task.done():
+            exc = token_task.exception()
+            failed = exc is not None or token_task.result() is None
+            if not failed:
+                token_err_streak = 0
+                if time.monotonic() - token_started > 10 * 60:
+                    logger.info("Refreshing pre-warmed login token")
+                    token_task = asyncio.create_task(usc_async.login(config))
+                    token_started = time.monotonic()
+            elif token_retry_at == 0.0:
+                # Just noticed the failure: honor Retry-After on 429,
+                # otherwise back off exponentially (5/10/...300s)
+                if isinstance(exc, usc.RateLimited):
+                    wait = exc.retry_after
+                else:
+                    wait = min(300, 5 * 2 ** token_err_streak)
+                token_err_streak += 1
+                token_retry_at = time.monotonic() + wait
+                logger.info("Pre-warmed login failed, retrying it in %.0fs", wait)
+            elif time.monotonic() >= token_retry_at:
+                token_retry_at = 0.0
+                token_task = asyncio.create_task(usc_async.login(config))
+                token_started = time.monotonic()
 
-            if class_id is not None:
-                logger.info(f"✓ Found class! Class ID: {class_id}")
-                break
+        # Cap a single probe at the poll interval so one slow request
+        # can't stretch the polling cadence. Inside the hot window the
+        # listing TTL cache is bypassed too - a 2s cadence is pointless
+        # if probes are answered from a cached listing.
+        result = await asyncio.wait_for(
+            _probe_dates(config, candidate_dates, probe_semaphore, matcher,
+                         bypass_cache=in_hot_window),
+            timeout=poll_interval,
+        )
 
-            logger.info(f"No matching classes found. Waiting {poll_interval}s before next check...")
-            time.sleep(poll_interval)
+        if result is None and not in_hot_window:
+            neg_cache[neg_key] = time.monotonic() + neg_ttl
+        return result
 
-        except KeyboardInterrupt:
-            logger.info("\n" + "="*60)
-            logger.info("Interrupted by user. Exiting...")
-            logger.info("="*60)
-            return 130  # Standard exit code for SIGINT
-        except Exception as e:
-            logger.error(f"Error during class search: {e}", exc_info=True)
-            logger.info(f"Retrying in {poll_interval}s...")
-            time.sleep(poll_interval)
-
-    # Check if we found a class
-    if class_id is None:
-        logger.warning("="*60)
-        logger.warning("Deadline reached. No suitable class found.")
-        logger.warning("Possible reasons:")
-        logger.warning("  - No classes available at this location/date")
-        logger.warning("  - Filters too restrictive")
-        logger.warning("  - Classes booked by others")
-        logger.warning("="*60)
-        return 1
+    def interval(attempt_no, was_empty, was_error):
+        """Backoff policy between probes (state lives in _run's scope)."""
+        nonlocal hot_overruns, empty_streak, err_streak
 
-    # Login and book
-    logger.info("="*60)
-    logger.info(f"Proceeding to book class {class_id}")
-    logger.info("="*60)
+        if was_error:
+            # Errors say nothing about availability - drop the negative entry
+            neg_cache.pop(neg_key, None)
+            # Short, jittered backoff for transient errors (1/2/4/...30s)
+            err_streak += 1
+            sleep_s = min(30, 2 ** (err_streak - 1)) * random.uniform(0.75, 1.25)
+            logger.info("Retrying in %.0fs...", sleep_s)
+            return sleep_s
+
+        err_streak = 0
+        sleep_s, hot_overruns = _next_sleep(
+            datetime.now(), release_time, poll_interval, max_poll_interval,
+            hot_overruns, empty_streak
+        )
+        empty_streak += 1
+        logger.info("No matching classes found. Waiting %.0fs before next check...", sleep_s)
+        return sleep_s
+
+    logger.info(f"Polling will continue until {deadline.strftime('%Y-%m-%d %H:%M:%S')}")
 
     try:
-        # Login
-        token = usc.login(config)
-        if token is None:
-            logger.error("="*60)
-            logger.error("Login failed. Cannot proceed with booking.")
-            logger.error("Please check your credentials in .env file")
-            logger.error("="*60)
+        async for result in usc_async.poll_until(None, probe, interval, stop=stop):
+            if result is not None:
+                class_id = result
+                logger.info("✓ Found class! Class ID: %s", class_id)
+                break
+
+        if class_id is None and interrupted:
+            logger.info(_BANNER)
+            logger.info("Interrupted by user. Exiting...")
+            logger.info(_BANNER)
+            return 130  # Standard exit code for SIGINT
+
+        # Check if we found a class
+        if class_id is None:
+            logger.warning(_BANNER)
+            logger.warning("Deadline reached. No suitable class found.")
+            logger.warning("Possible reasons:")
+            logger.warning("  - No classes available at this location/date")
+            logger.warning("  - Filters too restrictive")
+            logger.warning("  - Classes booked by others")
+            logger.warning(_BANNER)
             return 1
 
-        # Book the class
-        success = usc.bookEvent(class_id, token, config)
+        # Login and book
+        logger.info(_BANNER)
+        logger.info(f"Proceeding to book class {class_id}")
+        logger.info(_BANNER)
 
-        if success:
-            logger.info("="*60)
-            logger.info("✓ BOOKING SUCCESSFUL!")
-            logger.info(f"Class {class_id} has been booked.")
-            logger.info("Check your USC app to confirm.")
-            logger.info("="*60)
-            return 0
-        else:
-            logger.error("="*60)
-            logger.error("✗ BOOKING FAILED")
-            logger.error("Check the error messages above for details.")
-            logger.error("="*60)
+        try:
+            # Login (the pre-warmed token is usually ready by now)
+            token = None
+            try:
+                token = await asyncio.wait_for(token_task, timeout=10)
+            except Exception as e:
+                logger.warning(f"Pre-warmed login failed: {e}. Logging in again...")
+            token_task = None
+            if token is None:
+                # Retry once in the foreground before giving up
+                token = await usc_async.login(config)
+            if token is None:
+                logger.error(_BANNER)
+                logger.error("Login failed. Cannot proceed with booking.")
+                logger.error("Please check your credentials in .env file")
+                logger.error(_BANNER)
+                return 1
+
+            # Book the class
+            success = await usc_async.book_event(class_id, token, config)
+
+            if success:
+                logger.info(_BANNER)
+                logger.info("✓ BOOKING SUCCESSFUL!")
+                logger.info(f"Class {class_id} has been booked.")
+                logger.info("Check your USC app to confirm.")
+                logger.info(_BANNER)
+                return 0
+            else:
+                logger.error(_BANNER)
+                logger.error("✗ BOOKING FAILED")
+                logger.error("Check the error messages above for details.")
+                logger.error(_BANNER)
+                return 1
+
+        except Exception as e:
+            logger.error(_BANNER)
+            logger.error(f"Unexpected error during login/booking: {e}")
+            logger.error(_BANNER)
+            logger.debug("Full traceback:", exc_info=True)
             return 1
 
-    except Exception as e:
-        logger.error("="*60)
-        logger.error(f"Unexpected error during login/booking: {e}")
-        logger.error("="*60)
-        logger.debug("Full traceback:", exc_info=True)
-        return 1
+    finally:
+        deadline_handle.cancel()
+        if token_task is not None:
+            if token_task.done():
+                token_task.exception()  # Retrieve, avoid 'never retrieved' noise
+            else:
+                token_task.cancel()
+        await usc_async.close_session()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,332 @@
+"""
+Async variants of the USC API calls, built on aiohttp.
+
+The synchronous functions in uscApi serialize their HTTPS round-trips;
+this module lets several candidate dates be polled concurrently over a
+bounded connection pool. Configuration, filter, and bookability helpers
+are shared with uscApi so both paths behave identically.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+import uscApi as usc
+
+logger = logging.getLogger('usc_auto_book')
+
+
+# ============================================================
+# HTTP Session
+# ============================================================
+
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared aiohttp session, creating it on first use.
+
+    Must be called from within a running event loop. Concurrency per host
+    is bounded via USC_HTTP_CONCURRENCY (default 8).
+    """
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        connector = aiohttp.TCPConnector(
+            limit=20,
+            limit_per_host=int(os.getenv('USC_HTTP_CONCURRENCY', '8')),
+        )
+        _SESSION = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _SESSION
+
+
+async def close_session():
+    """Close the shared aiohttp session (call once per event loop)."""
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+
+# ============================================================
+# API Functions
+# ============================================================
+
+async def login(config: Dict[str, Any]) -> Optional[str]:
+    """
+    Async variant of uscApi.login.
+
+    Returns:
+        Bearer token if successful, None otherwise
+    """
+    request_url = config.get('auth_url') or config['baseURL'] + '/auth/token'
+
+    data = {
+        'username': config['email'],
+        'password': config['password'],
+        'client_secret': config['clientSecret'],
+        'client_id': config['clientId'],
+        'grant_type': 'password'
+    }
+
+    logger.info(f"Logging in as {config['email']}")
+
+    async with get_session().post(request_url, data=data) as response:
+        if response.status == 200:
+            payload = await response.json()
+            logger.info("Login successful")
+            return payload['data']['access_token']
+        elif response.status == 429:
+            retry_after = response.headers.get('Retry-After', '60')
+            raise usc.RateLimited(int(retry_after) if retry_after.isdigit() else 60)
+        else:
+            logger.error(f"Login failed with status {response.status}")
+            return None
+
+
+async def find_class(config: Dict[str, Any],
+                     date: Optional[datetime] = None,
+                     semaphore: Optional[asyncio.Semaphore] = None,
+                     matcher: Optional[Any] = None,
+                     bypass_cache: bool = False) -> Optional[int]:
+    """
+    Async variant of uscApi.findClass.
+
+    Args:
+        config: Configuration dictionary
+        date: Target date (defaults to config['advanceDays'] from today)
+        semaphore: Optional semaphore bounding concurrent requests
+        matcher: Precompiled filter predicate from usc.compile_filters();
+            polling loops can build it once instead of once per call
+        bypass_cache: Skip the listing TTL cache and always ask the
+            server (conditional revalidation still applies); set inside
+            the hot release window, where a TTL-fresh answer is stale
+
+    Returns:
+        Class ID if bookable class found, None otherwise
+    """
+    if date is None:
+        advance_days = config.get('advanceDays', 14)
+        date = datetime.today() + timedelta(days=advance_days)
+
+    str_date = date.strftime('%Y-%m-%d')
+
+    if semaphore is not None:
+        async with semaphore:
+            return await _find_class(config, str_date, matcher, bypass_cache)
+    return await _find_class(config, str_date, matcher, bypass_cache)
+
+
+async def _find_class(config: Dict[str, Any], str_date: str,
+                      matcher: Optional[Any] = None,
+                      bypass_cache: bool = False) -> Optional[int]:
+    location_id = config['locationId']
+
+    request_url = config.get('courses_url') or config['baseURL'] + '/courses'
+    params = dict(config.get('courses_params_tmpl') or {
+        'forDurationOfDays': 1,
+        'query': '',
+        'pageSize': 100,
+        'page': 1,
+        'locationId': location_id,
+    })
+    params['startDate'] = str_date
+
+    logger.info(f"Searching for classes at location {location_id} on {str_date}")
+
+    # Shared with the sync path: a listing fetched within the TTL is
+    # reused directly instead of re-requested (cache-aside; booking
+    # invalidates via usc.invalidate_courses_cache).
+    cache_key = (location_id, str_date)
+    entry = usc._courses_cache.get(cache_key)
+
+    if not bypass_cache and entry is not None and time.time() < entry['expires']:
+        logger.debug("Using cached class list for %s (TTL not expired)", str_date)
+        classes = entry['classes']
+    else:
+        # Past TTL, cache bypassed, or no cache yet: revalidate with
+        # conditional headers so an unchanged listing is a body-less 304.
+        headers = dict(config['headers'])
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        async with get_session().get(request_url, params=params,
+                                     headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                logger.debug("Class list for %s unchanged (304), reusing cache", str_date)
+                entry['expires'] = time.time() + usc._cache_ttl(config)
+                classes = entry['classes']
+                payload = None
+            elif response.status == 429:
+                retry_after = response.headers.get('Retry-After', '60')
+                raise usc.RateLimited(int(retry_after) if retry_after.isdigit() else 60)
+            elif response.status != 200:
+                logger.error(f"Failed to fetch classes (status {response.status})")
+                return None
+            else:
+                payload = await response.json()
+
+        if payload is not None:
+            classes = payload['data'].get('classes', [])
+
+            if 'no-store' not in response.headers.get('Cache-Control', ''):
+                usc._courses_cache[cache_key] = {
+                    'classes': classes,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'expires': time.time() + usc._cache_ttl(config),
+                }
+
+    if not classes:
+        logger.info(f"No classes found on {str_date}")
+        return None
+
+    if matcher is None:
+        matcher = usc.compile_filters(config)
+
+    for cls in classes:
+        if usc.is_bookable(cls) and (matcher is None or matcher(cls)):
+            logger.info(
+                f"Found bookable class matching filters: '{cls['title']}' "
+                f"(ID: {cls['id']}) at {cls.get('startDateTimeUTC', 'N/A')}"
+            )
+            return cls['id']
+
+    logger.info(f"Found {len(classes)} classes on {str_date}, none bookable/matching")
+    return None
+
+
+async def book_event(class_id: int, bearer: str, config: Dict[str, Any],
+                     max_retries: int = 2) -> bool:
+    """
+    Async variant of uscApi.bookEvent.
+
+    Mirrors the sync path's retry_on_failure policy: transient network
+    errors retry with full jitter, 429 honors the server's Retry-After,
+    and retries are kept low to avoid double-booking. Definitive answers
+    (booked, full, auth problems) are never retried.
+
+    Returns:
+        True if booking successful, False otherwise
+    """
+    request_url = config.get('bookings_url') or config['baseURL'] + '/bookings'
+
+    headers = dict(config['headers'])
+    headers['authorization'] = f'Bearer {bearer}'
+
+    logger.info(f"Attempting to book class {class_id}")
+
+    for attempt in range(max_retries + 1):
+        try:
+            async with get_session().post(request_url,
+                                          data={'courseId': class_id},
+                                          headers=headers) as response:
+                if response.status == 200:
+                    payload = await response.json()
+                    logger.info(f"Successfully booked class {class_id}! Booking ID: {payload['data']['id']}")
+                    usc.invalidate_courses_cache()
+                    return True
+                elif response.status == 409:
+                    logger.error("Booking failed: Class already booked or full")
+                    return False
+                elif response.status == 401:
+                    logger.error("Booking failed: Authentication token expired")
+                    return False
+                elif response.status == 403:
+                    logger.error("Booking failed: Access forbidden")
+                    return False
+                elif response.status == 429:
+                    retry_after = response.headers.get('Retry-After', '60')
+                    raise usc.RateLimited(int(retry_after) if retry_after.isdigit() else 60)
+                else:
+                    logger.error(f"Booking failed with status {response.status}")
+                    return False
+        except usc.RateLimited as e:
+            if attempt == max_retries:
+                logger.error(f"book_event still rate limited after {max_retries} retries")
+                raise
+            logger.warning(
+                f"book_event rate limited (attempt {attempt + 1}/{max_retries + 1}). "
+                f"Honoring Retry-After: {e.retry_after}s"
+            )
+            await asyncio.sleep(e.retry_after)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == max_retries:
+                logger.error(f"book_event failed after {max_retries} retries: {e}")
+                raise
+            wait_time = random.uniform(0, 2 ** attempt)
+            logger.warning(
+                f"book_event failed (attempt {attempt + 1}/{max_retries + 1}): {e}. "
+                f"Retrying in {wait_time:.1f}s..."
+            )
+            await asyncio.sleep(wait_time)
+
+
+# ============================================================
+# Polling
+# ============================================================
+
+async def _sleep_or_stop(seconds: float, stop: Optional[asyncio.Event]):
+    """Sleep, waking immediately if the stop event is set meanwhile."""
+    if stop is None:
+        await asyncio.sleep(seconds)
+        return
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def poll_until(deadline_mono: Optional[float], find_fn, interval_fn,
+                     stop: Optional[asyncio.Event] = None):
+    """
+    Drive find_fn until it returns a match, the monotonic deadline
+    passes, or the stop event is set, yielding each probe result.
+
+    find_fn is an argument-less coroutine function performing one probe;
+    interval_fn(attempt, was_empty, was_error) returns how long to sleep
+    before the next probe. Keeping the backoff/jitter policy in the
+    caller's interval_fn means this scheduler stays network-free and the
+    policy can be exercised without HTTP. RateLimited is handled here by
+    honoring the server's Retry-After directly. When a stop event is
+    given, setting it ends any in-progress sleep and the loop promptly
+    (signal handlers, or a deadline scheduled with loop.call_at); with
+    deadline_mono=None the event is the only termination condition, so
+    the loop never has to read the clock itself.
+    """
+    attempt = 0
+    while deadline_mono is None or time.monotonic() < deadline_mono:
+        if stop is not None and stop.is_set():
+            return
+        attempt += 1
+        was_error = False
+        result = None
+        try:
+            result = await find_fn()
+        except usc.RateLimited as e:
+            logger.warning("Rate limited by API. Honoring Retry-After: %ss", e.retry_after)
+            await _sleep_or_stop(e.retry_after, stop)
+            continue
+        except Exception as e:
+            was_error = True
+            logger.error("Error during class search: %s", e, exc_info=True)
+
+        yield result
+        if result is not None:
+            return
+
+        sleep_s = interval_fn(attempt, not was_error, was_error)
+        if sleep_s > 0:
+            await _sleep_or_stop(sleep_s, stop)